@@ -5,21 +5,28 @@ ZMK setup script
 """
 
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from subprocess import CalledProcessError
 import sys
 import textwrap
-from requests.exceptions import HTTPError
 from .config import Config
 from .menu import StopMenu, show_prompt
 from .repo import Repo, select_repo, check_dependencies
 from .terminal import Color, colorize, enable_vt_mode
-from .util import StopWizard, download, print_block
+from .util import (
+    StopWizard,
+    download,
+    get_file_names,
+    print_block,
+    run_in_background,
+)
 from .zmk import (
     KeyboardSelection,
     add_to_build_matrix,
     check_repo_files,
     get_config_file_name,
+    get_hardware_list,
     get_keymap_file_name,
     select_keyboard,
 )
@@ -74,7 +81,7 @@ def main():
     if args.template_url:
         config.template_url = args.template_url
     if args.files_url:
-        config.files_url = args.file_url
+        config.files_url = args.files_url
 
     try:
         with enable_vt_mode():
@@ -94,6 +101,10 @@ def run_wizard(config: Config):
     """
     check_dependencies()
 
+    # Download the hardware list in the background while the repo is prepared.
+    # If the wizard exits before it is needed, the download is abandoned.
+    hardware = run_in_background(get_hardware_list, config)
+
     repo = select_repo(config)
 
     if not repo.is_repo:
@@ -107,7 +118,7 @@ def run_wizard(config: Config):
     repo.pull()
     check_repo_files(repo, config)
 
-    selected = select_keyboard(config)
+    selected = select_keyboard(config, hardware)
 
     print_pending_changes(repo, selected)
 
@@ -122,24 +133,21 @@ def print_pending_changes(repo: Repo, selected: KeyboardSelection):
     """
     Print a message indicating the changes that will be made.
     """
-    print("Adding the following to your user config repo:")
+    lines = ["Adding the following to your user config repo:"]
 
     boards = colorize(f"({' '.join(selected.board_ids)})", Color.GRAY)
     shields = colorize(f"({' '.join(selected.shield_ids)})", Color.GRAY)
 
     if selected.shield_ids:
-        print_block(
-            f"""
-            - Shield:       {selected.keyboard["name"]}  {shields}
-            - MCU Board:    {selected.controller["name"]}  {boards}
-            """,
-            trim=True,
-        )
+        lines.append(f"- Shield:       {selected.keyboard['name']}  {shields}")
+        lines.append(f"- MCU Board:    {selected.controller['name']}  {boards}")
     else:
-        print(f"- Board:        {selected.keyboard['name']}  {boards}")
+        lines.append(f"- Board:        {selected.keyboard['name']}  {boards}")
 
-    print(f"- Repo URL:     {repo.remote_url()}")
-    print()
+    lines.append(f"- Repo URL:     {repo.remote_url}")
+    lines.append("")
+
+    print("\n".join(lines))
 
 
 def apply_changes(repo: Repo, config: Config, selected: KeyboardSelection):
@@ -157,44 +165,55 @@ def download_files(repo: Repo, config: Config, selected: KeyboardSelection):
     Downloads any keyboard files (keymaps, configs, etc.) that are missing for
     the selected keyboard.
     """
-    base_path = repo.path / "config"
+    from requests.exceptions import RequestException
 
-    config_name = get_config_file_name(selected.keyboard)
-    keymap_name = get_keymap_file_name(selected.keyboard)
+    base_path = repo.path / "config"
 
-    keyboard_files = [config_name, keymap_name]
+    keyboard_files = [
+        get_config_file_name(selected.keyboard),
+        get_keymap_file_name(selected.keyboard),
+    ]
+    existing_files = get_file_names(base_path)
+    pending: list[tuple[str, Path]] = []
 
     for name in keyboard_files:
         dest = base_path / name
-        if dest.exists():
+        if name in existing_files:
             print(f"{name} already exists")
             continue
 
         print(f"Downloading {name}...")
         url = f"{config.files_url}/{selected.keyboard['directory']}/{name}"
-        try:
-            download(url, dest)
-        except HTTPError as ex:
-            # Failed to download the file. Create an empty placeholder file.
-            print(ex)
-            with dest.open("w"):
-                pass
+        pending.append((url, dest))
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(download, url, dest) for url, dest in pending]
+
+        for (_, dest), future in zip(pending, futures):
+            try:
+                future.result()
+            except RequestException as ex:
+                # Failed to download the file. Create an empty placeholder file.
+                print(ex)
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                dest.touch()
 
 
 def commit_and_push_changes(repo: Repo, selected: KeyboardSelection):
     """
     Makes a commit and pushes it.
     """
-    if not repo.has_changes():
+    status = repo.get_status()
+    if not status:
         print("This keyboard is already in the repo. No changes made.")
         return
 
     print("Committing changes...")
     print()
-    repo.commit_changes(f"Add {selected.keyboard['name']}")
+    repo.commit_changes(f"Add {selected.keyboard['name']}", status=status)
 
     print()
-    print(f"Pushing changes to {repo.remote_url()} ...")
+    print(f"Pushing changes to {repo.remote_url} ...")
     print()
 
     try:
@@ -202,18 +221,18 @@ def commit_and_push_changes(repo: Repo, selected: KeyboardSelection):
     except CalledProcessError as ex:
         error = textwrap.dedent(
             f"""
-            {colorize(f'Failed to push to {repo.remote_url()}', Color.RED)}
+            {colorize(f'Failed to push to {repo.remote_url}', Color.RED)}
             Check your repo's URL and try again by running the following commands:
                 git remote rm origin
                 git remote add origin <PASTE_REPO_URL_HERE>
-                git push --set-upstream origin {repo.get_head_ref()}
+                git push --set-upstream origin {repo.head_ref}
             """
         )
         raise StopWizard(error) from ex
 
     print()
 
-    actions_url = repo.actions_url()
+    actions_url = repo.actions_url
     if actions_url:
         print_block(
             f"""\
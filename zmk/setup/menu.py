@@ -5,6 +5,9 @@ Simple terminal menu
 """
 
 import shutil
+import signal
+import sys
+from contextlib import contextmanager
 from dataclasses import dataclass
 from typing import Callable, Generic, Iterable, Optional, TypeVar
 from . import terminal
@@ -16,6 +19,13 @@ class _MenuSize:
     height: int
 
 
+@dataclass
+class _DrawState:
+    menu_size: _MenuSize
+    focus_index: int
+    scroll_index: int
+
+
 class StopMenu(Exception):
     """
     Exception thrown when the user cancels the menu without making a selection
@@ -24,6 +34,9 @@ class StopMenu(Exception):
 
 T = TypeVar("T")
 
+# Windows has no resize signal, so the terminal size must be checked each time.
+_HAS_RESIZE_SIGNAL = hasattr(signal, "SIGWINCH")
+
 
 class TerminalMenu(Generic[T]):
     """
@@ -35,8 +48,11 @@ class TerminalMenu(Generic[T]):
     formatter: Callable[[T], str]
     focus_color: str | terminal.Color
     default_index: int
+    _formatted: list[str]
     _focus_index: int
     _scroll_index: int
+    _last_draw: Optional[_DrawState]
+    _menu_size: Optional[_MenuSize]
 
     def __init__(
         self,
@@ -49,10 +65,13 @@ class TerminalMenu(Generic[T]):
         self.title = title
         self.items = list(items)
         self.formatter = formatter or str
+        self._formatted = [self.formatter(item) for item in self.items]
         self.focus_color = focus_color
         self.default_index = default_index
         self._focus_index = 0
         self._scroll_index = 0
+        self._last_draw = None
+        self._menu_size = None
 
     def show(self):
         """
@@ -61,27 +80,59 @@ class TerminalMenu(Generic[T]):
         :return: The selected item.
         :raises StopMenu: The user canceled the menu without making a selection.
         """
-        # The cursor will be hidden on the last line of the console.
+        # The cursor will be hidden on the last line of the console. Hiding it
+        # is batched with the first frame of the menu.
         try:
-            with terminal.hide_cursor():
+            with terminal.disable_echo(), self._watch_terminal_size():
                 self._focus_index = self.default_index
+                self._last_draw = None
+                prefix = terminal.HIDE_CURSOR
 
                 while True:
                     menu_size = self._get_menu_size()
                     self._update_scroll_index(menu_size)
 
-                    self._print_menu(menu_size)
+                    self._print_menu(menu_size, prefix=prefix)
+                    prefix = ""
 
                     if self._handle_input(menu_size):
                         return self.items[self._focus_index]
-
-                    self._reset_cursor_to_top(menu_size)
         finally:
-            # Add one blank line at the end to separate further output from the menu.
-            print()
-
-    def _print_menu(self, menu_size: _MenuSize):
-        print(self.title)
+            # Show the cursor and add one blank line at the end to separate
+            # further output from the menu.
+            sys.stdout.write(terminal.SHOW_CURSOR + "\n")
+            sys.stdout.flush()
+
+    def _print_menu(self, menu_size: _MenuSize, prefix=""):
+        # The cursor is left on the line after the menu. If only the focused
+        # item changed, redraw just the two affected items. Otherwise, go back
+        # to the top of the menu and redraw all of it.
+        if self._can_redraw_focus(menu_size):
+            text = self._get_focus_change_text(menu_size)
+        else:
+            if self._last_draw:
+                self._reset_cursor_to_top(self._last_draw.menu_size)
+
+            text = self._get_menu_text(menu_size)
+
+        sys.stdout.write(prefix + text)
+        sys.stdout.flush()
+
+        self._last_draw = _DrawState(
+            menu_size=menu_size,
+            focus_index=self._focus_index,
+            scroll_index=self._scroll_index,
+        )
+
+    def _can_redraw_focus(self, menu_size: _MenuSize):
+        return (
+            self._last_draw is not None
+            and self._last_draw.menu_size == menu_size
+            and self._last_draw.scroll_index == self._scroll_index
+        )
+
+    def _get_menu_text(self, menu_size: _MenuSize):
+        lines = [self.title]
 
         display_count = self._get_display_count(menu_size)
 
@@ -89,12 +140,33 @@ class TerminalMenu(Generic[T]):
             index = self._scroll_index + row
             focused = index == self._focus_index
 
-            self._print_item(self.items[index], focused=focused, menu_size=menu_size)
+            lines.append(self._format_item(index, focused=focused, menu_size=menu_size))
+
+        return "".join(line + "\n" for line in lines)
+
+    def _get_focus_change_text(self, menu_size: _MenuSize):
+        last_focus_index = self._last_draw.focus_index
+        if self._focus_index == last_focus_index:
+            return ""
+
+        display_count = self._get_display_count(menu_size)
+        parts = []
+
+        for index in (last_focus_index, self._focus_index):
+            focused = index == self._focus_index
+            lines_up = display_count - (index - self._scroll_index)
+
+            parts.append(terminal.cursor_up(lines_up))
+            parts.append(self._format_item(index, focused=focused, menu_size=menu_size))
+            parts.append("\n")
+            parts.append(terminal.cursor_down(lines_up - 1))
 
-    def _print_item(self, item: T, focused: bool, menu_size: _MenuSize):
+        return "".join(parts)
+
+    def _format_item(self, index: int, focused: bool, menu_size: _MenuSize):
         color = self.focus_color if focused else "0"
         indent = "> " if focused else "  "
-        text = indent + self.formatter(item)
+        text = indent + self._formatted[index]
 
         # Menu items are assumed to be one line each, so truncate if needed.
         text = text[0 : menu_size.width]
@@ -103,10 +175,10 @@ class TerminalMenu(Generic[T]):
         # when scrolling.
         text = text.ljust(menu_size.width)
 
-        print(terminal.colorize(text, color))
+        return terminal.colorize(text, color)
 
     def _handle_input(self, menu_size: _MenuSize):
-        key = terminal.read_key()
+        key = terminal.read_key_raw()
 
         if key == terminal.RETURN:
             return True
@@ -130,10 +202,32 @@ class TerminalMenu(Generic[T]):
         self._focus_index = min(max(0, self._focus_index), len(self.items) - 1)
         return False
 
+    @contextmanager
+    def _watch_terminal_size(self):
+        self._menu_size = None
+
+        if not _HAS_RESIZE_SIGNAL:
+            yield
+            return
+
+        def on_resize(*_):
+            self._menu_size = None
+
+        old_handler = signal.signal(signal.SIGWINCH, on_resize)
+        try:
+            yield
+        finally:
+            signal.signal(signal.SIGWINCH, old_handler)
+
     def _get_menu_size(self) -> _MenuSize:
-        extra_lines = 3  # console prompt + title line + empty line at end
-        size = shutil.get_terminal_size()
-        return _MenuSize(width=size.columns, height=size.lines - extra_lines)
+        if self._menu_size is None or not _HAS_RESIZE_SIGNAL:
+            extra_lines = 3  # console prompt + title line + empty line at end
+            size = shutil.get_terminal_size()
+            self._menu_size = _MenuSize(
+                width=size.columns, height=size.lines - extra_lines
+            )
+
+        return self._menu_size
 
     def _get_display_count(self, menu_size: _MenuSize):
         return min(len(self.items), menu_size.height)
@@ -4,6 +4,8 @@
 Git repository functions
 """
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
 from subprocess import Popen, PIPE, STDOUT
 from pathlib import Path
 from typing import Optional
@@ -33,14 +35,34 @@ class Repo:
         """Get whether there is a Git repo at this location"""
         return (self.path / ".git").is_dir()
 
-    def git(self, *args: str):
-        """Run Git and echo the output"""
-        with Popen(
-            ["git", *args], cwd=self.path, encoding="utf-8", stdout=PIPE, stderr=STDOUT
-        ) as process:
-            with process.stdout:
-                prefix_output(process.stdout, colorize("git: ", Color.BLUE))
-            process.wait()
+    def git(self, *args: str, quiet=False, check=False):
+        """
+        Run Git and echo the output
+
+        :param quiet: Let Git write directly to the terminal instead of echoing
+        its output with a prefix. Use this for commands which print little or
+        no output.
+        :param check: Raise StopWizard if Git fails.
+        """
+        if quiet:
+            returncode = subprocess.run(
+                ["git", *args], cwd=self.path, check=False
+            ).returncode
+        else:
+            with Popen(
+                ["git", *args],
+                cwd=self.path,
+                encoding="utf-8",
+                stdout=PIPE,
+                stderr=STDOUT,
+            ) as process:
+                with process.stdout:
+                    prefix_output(process.stdout, colorize("git: ", Color.BLUE))
+                returncode = process.wait()
+
+        if check and returncode:
+            error = subprocess.CalledProcessError(returncode, ["git", *args])
+            raise StopWizard(str(error))
 
     def git_output(self, *args: str):
         """Run Git and return the output"""
@@ -48,24 +70,35 @@ class Repo:
             ["git", *args], cwd=self.path, encoding="utf-8"
         ).rstrip()
 
+    @cached_property
     def remote_url(self):
         """Get the URL for the main remote"""
-        return self.git_output("remote", "get-url", self.git_output("remote"))
+        return self.git_output("ls-remote", "--get-url")
 
+    @cached_property
     def actions_url(self):
         """Get the GitHub actions URL, if it exists"""
-        remote_url = self.remote_url()
+        remote_url = self.remote_url
         if remote_url.startswith("https://github.com"):
             return remote_url.removesuffix(".git") + "/actions"
         return None
 
+    def get_status(self):
+        """Get the output of 'git status --porcelain'"""
+        return self.git_output("status", "--porcelain")
+
     def has_changes(self):
         """Get whether there are local changes"""
-        return bool(self.git_output("status", "--porcelain"))
+        return bool(self.get_status())
 
     def fetch(self, *args: str):
-        """Run 'git fetch'"""
-        self.git("fetch", *args)
+        """
+        Run 'git fetch'
+
+        :raises StopWizard: The fetch failed.
+        """
+        # Fail here instead of at a later command that needs the fetched refs.
+        self.git("fetch", *args, check=True)
 
     def pull(self):
         """Run 'git pull'"""
@@ -75,7 +108,8 @@ class Repo:
         """Run 'git push'"""
         self.git("push", *args)
 
-    def get_head_ref(self):
+    @cached_property
+    def head_ref(self):
         """Gets the symbolic ref for the head commit"""
         return self.git_output("symbolic-ref", "--short", "HEAD")
 
@@ -84,49 +118,82 @@ class Repo:
         Pushes the current branch to origin and sets it as the upstream tracking
         branch.
         """
-        self.push("-u", "origin", self.get_head_ref())
+        self.push("-u", "origin", self.head_ref)
 
     def checkout_file(self, commit: str, path: Path):
         """
         Checks out the file at "path" from "commit".
         """
-        self.git("checkout", commit, "--", str(path.relative_to(self.path)))
+        relative_path = str(path.relative_to(self.path))
+        self.git(
+            "checkout", "--quiet", commit, "--", relative_path, quiet=True, check=True
+        )
 
-    def commit_changes(self, message: str):
+    def commit_changes(self, message: str, status: Optional[str] = None):
         """
         Adds all local changes and commits them.
+
+        :param status: Output of get_status(), if the caller just got it. This
+        is used to skip "git add" when there are no untracked files.
         """
-        self.git("add", ".")
-        self.git("commit", "-m", message)
+        if status is not None and not _has_untracked_files(status):
+            # "commit -a" picks up modified files, so there is nothing to add.
+            self.git("commit", "--quiet", "-am", message, quiet=True, check=True)
+            return
+
+        self.git("add", ".", quiet=True, check=True)
+        self.git("commit", "--quiet", "-m", message, quiet=True, check=True)
+
+
+def _has_untracked_files(status: str):
+    return any(line.startswith("??") for line in status.splitlines())
+
+
+_REQUIRED_GIT_CONFIG = {
+    "user.name": "Git username not set!\nRun: git config --global user.name 'My Name'",
+    "user.email": (
+        "Git email not set!\n"
+        "Run: git config --global user.email 'example@myemail.com'"
+    ),
+}
 
 
 def check_dependencies():
     """
     Verifies that Git is installed and required Git configuration has been set.
     """
+    repo = Repo()
+
+    # These are independent, so run them in parallel to overlap process startup.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        version = executor.submit(repo.git_output, "--version")
+        user_config = executor.submit(
+            repo.git_output, "config", "--get-regexp", r"^user\.(name|email)$"
+        )
+
     try:
-        Repo().git_output("--version")
-    except subprocess.CalledProcessError as ex:
+        version.result()
+    except (subprocess.CalledProcessError, OSError) as ex:
         raise StopWizard(
             "This script requires Git. "
             "Please install it from https://git-scm.com/downloads"
         ) from ex
 
-    _check_git_config(
-        "user.name",
-        "Git username not set!\nRun: git config --global user.name 'My Name'",
-    )
-    _check_git_config(
-        "user.email",
-        "Git email not set!\nRun: git config --global user.email 'example@myemail.com'",
-    )
-
-
-def _check_git_config(option: str, message: str):
     try:
-        Repo().git_output("config", option)
-    except subprocess.CalledProcessError as ex:
-        raise StopWizard(message) from ex
+        output = user_config.result()
+    except subprocess.CalledProcessError:
+        # Git exits with an error if none of the options are set.
+        output = ""
+
+    options = {line.partition(" ")[0] for line in output.splitlines()}
+    missing = [
+        message
+        for option, message in _REQUIRED_GIT_CONFIG.items()
+        if option not in options
+    ]
+
+    if missing:
+        raise StopWizard("\n".join(missing))
 
 
 def select_repo(config: Config) -> Repo:
@@ -4,6 +4,7 @@
 Terminal utilities
 """
 import os
+import re
 import sys
 from contextlib import contextmanager
 from enum import Enum
@@ -19,6 +20,10 @@ class Color(Enum):
     GRAY = "90"
 
 
+_COLOR_PREFIX = {c: f"\x1b[{c.value}m" for c in Color}
+_RESET = "\x1b[0m"
+
+
 def colorize(text: str, color: str | Color):
     """
     Wrap text in ANSI escape codes to change its color.
@@ -27,23 +32,28 @@ def colorize(text: str, color: str | Color):
     :param escape: The color code to use (the text between "[" and "m") or a
     Color enum value.
     """
-    if isinstance(color, Color):
-        color = color.value
+    prefix = _COLOR_PREFIX.get(color) or f"\x1b[{color}m"
+    return prefix + text + _RESET
 
-    return f"\x1b[{color}m{text}\x1b[0m"
 
+HIDE_CURSOR = "\x1b[?25l"
+SHOW_CURSOR = "\x1b[?25h"
 
-@contextmanager
-def hide_cursor():
-    """Context manager which hides the terminal cursor"""
 
-    try:
-        sys.stdout.write("\x1b[?25l")
-        sys.stdout.flush()
-        yield
-    finally:
-        sys.stdout.write("\x1b[?25h")
-        sys.stdout.flush()
+def cursor_up(count=1):
+    """
+    Returns the escape sequence which moves the cursor up the given number of
+    lines. Returns an empty string if count is zero.
+    """
+    return f"\x1b[{count}A" if count > 0 else ""
+
+
+def cursor_down(count=1):
+    """
+    Returns the escape sequence which moves the cursor down the given number of
+    lines. Returns an empty string if count is zero.
+    """
+    return f"\x1b[{count}B" if count > 0 else ""
 
 
 ESCAPE = b"\x1b"
@@ -57,6 +67,8 @@ HOME = b"\x1b[H"
 PAGE_UP = b"\x1b[5~"
 PAGE_DOWN = b"\x1b[6~"
 
+_CURSOR_POS_REPORT = re.compile(r"\x1b\[(\d+);(\d+)R")
+
 
 try:
     import msvcrt
@@ -91,6 +103,12 @@ try:
 
         Special keys such as arrow keys return xterm or vt escape sequences.
         """
+        return read_key_raw()
+
+    def read_key_raw():
+        """
+        Same as read_key(), but assumes console echo is already disabled.
+        """
         key = msvcrt.getch()
 
         if key == b"\x03":  # CTRL+C
@@ -141,9 +159,22 @@ try:
         finally:
             kernel32.SetConsoleMode(stdin_handle, old_stdin_mode)
 
+    def _write_control(text: str):
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+    def _read_cursor_pos_report():
+        report = ""
+        while not _CURSOR_POS_REPORT.search(report):
+            report += sys.stdin.read(1)
+        return report
+
 except ImportError:
+    import select
     import termios
 
+    _ESCAPE_SEQUENCE_TIMEOUT = 0.01
+
     @contextmanager
     def enable_vt_mode():
         """
@@ -174,7 +205,44 @@ except ImportError:
         Special keys such as arrow keys return xterm or vt escape sequences.
         """
         with disable_echo():
-            return os.read(sys.stdin.fileno(), 4)
+            return read_key_raw()
+
+    def read_key_raw():
+        """
+        Same as read_key(), but assumes console echo is already disabled.
+        """
+        fd = sys.stdin.fileno()
+        key = os.read(fd, 4)
+
+        # The rest of an escape sequence may arrive separately from the escape
+        # character, so wait briefly for it.
+        if key == ESCAPE and select.select([fd], [], [], _ESCAPE_SEQUENCE_TIMEOUT)[0]:
+            key += os.read(fd, 3)
+
+        return key
+
+    def _write_control(text: str):
+        # Control sequences are short and ASCII, so write them straight to the
+        # file descriptor instead of going through the text layer.
+        try:
+            fd = sys.stdout.fileno()
+        except (AttributeError, OSError):
+            sys.stdout.write(text)
+            sys.stdout.flush()
+            return
+
+        # Flush anything already buffered first to keep output in order.
+        sys.stdout.flush()
+        os.write(fd, text.encode("ascii"))
+
+    def _read_cursor_pos_report():
+        # The whole report normally arrives at once, so read it in as few
+        # calls as possible instead of one character at a time.
+        fd = sys.stdin.fileno()
+        report = ""
+        while not _CURSOR_POS_REPORT.search(report):
+            report += os.read(fd, 32).decode(errors="ignore")
+        return report
 
 
 def get_cursor_pos():
@@ -182,15 +250,10 @@ def get_cursor_pos():
     Returns the cursor position as a tuple (row, column). Positions are 1-based.
     """
     with disable_echo():
-        sys.stdout.write("\x1b[6n")
-        sys.stdout.flush()
+        _write_control("\x1b[6n")
 
-        result = ""
-        while not result.endswith("R"):
-            result += sys.stdin.read(1)
-
-        row, _, col = result.removeprefix("\x1b[").removesuffix("R").partition(";")
-        return (int(row), int(col))
+        match = _CURSOR_POS_REPORT.search(_read_cursor_pos_report())
+        return (int(match[1]), int(match[2]))
 
 
 def set_cursor_pos(row=1, col=1):
@@ -198,5 +261,4 @@ def set_cursor_pos(row=1, col=1):
     Sets the cursor to the given row and column. Positions are 1-based.
     """
     with disable_echo():
-        sys.stdout.write(f"\x1b[{row};{col}H")
-        sys.stdout.flush()
+        _write_control(f"\x1b[{row};{col}H")
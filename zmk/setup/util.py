@@ -3,11 +3,32 @@
 """
 Miscellaneous utilities
 """
+import functools
+import json
+import os
 import re
+import shutil
+import sys
 import textwrap
+import threading
+from concurrent.futures import Future
+from http import HTTPStatus
 from pathlib import Path
-from typing import TextIO
-import requests
+from typing import Callable, TextIO, TypeVar
+from . import __version__
+
+
+_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Seconds to wait for a server to connect or send data before giving up.
+_REQUEST_TIMEOUT = 10
+
+# Response headers saved with cached files, and the request headers used to
+# send them back to check if the file has changed.
+_VALIDATOR_HEADERS = {
+    "ETag": "If-None-Match",
+    "Last-Modified": "If-Modified-Since",
+}
 
 
 class StopWizard(Exception):
@@ -24,7 +45,41 @@ def print_block(text: str, trim=False):
     text = textwrap.dedent(text)
     if trim:
         text = text.strip()
-    print(text)
+    sys.stdout.write(text + "\n")
+
+
+def get_file_names(path: Path) -> set[str]:
+    """
+    Get the names of all entries in a directory, or an empty set if the
+    directory does not exist.
+    """
+    try:
+        with os.scandir(path) as entries:
+            return {entry.name for entry in entries}
+    except FileNotFoundError:
+        return set()
+
+
+T = TypeVar("T")
+
+
+def run_in_background(func: Callable[..., T], *args) -> Future[T]:
+    """
+    Run a function on a daemon thread and return a future for its result.
+
+    Unlike with ThreadPoolExecutor, the process does not wait for the function
+    to finish before exiting, so use this only for work that can be abandoned.
+    """
+    future: Future[T] = Future()
+
+    def run():
+        try:
+            future.set_result(func(*args))
+        except BaseException as ex:  # pylint: disable=broad-except
+            future.set_exception(ex)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
 
 
 def prefix_output(stream: TextIO, prefix: str):
@@ -39,15 +94,101 @@ def prefix_output(stream: TextIO, prefix: str):
 
 def download(url: str, filename: Path | str):
     """
-    Fetch a text file from "url" and write it to a file at "filename".
+    Fetch a file from "url" and write it to a file at "filename".
     """
-    response = requests.get(url, stream=True, allow_redirects=True)
+    with _get_session().get(
+        url, stream=True, allow_redirects=True, timeout=_REQUEST_TIMEOUT
+    ) as response:
+        response.raise_for_status()
+
+        path = Path(filename)
+        if not path.is_absolute():
+            path = path.expanduser().resolve()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Let urllib3 undo any Content-Encoding (e.g. gzip) while copying.
+        response.raw.decode_content = True
+
+        with path.open("wb") as f:
+            shutil.copyfileobj(response.raw, f, _DOWNLOAD_CHUNK_SIZE)
+
+
+def fetch_cached(url: str) -> bytes:
+    """
+    Fetch a file from "url" and return its contents.
+
+    The file is cached in the user cache directory. If a cached copy exists,
+    the server is asked to send the file only if it has changed.
+    """
+    path = _get_cache_path(url)
+    meta_path = path.with_suffix(".meta.json")
+
+    headers = _get_conditional_headers(meta_path) if path.exists() else {}
+
+    response = _get_session().get(url, headers=headers, timeout=_REQUEST_TIMEOUT)
     response.raise_for_status()
 
-    path = Path(filename).expanduser().resolve()
-    path.parent.mkdir(parents=True, exist_ok=True)
+    if response.status_code == HTTPStatus.NOT_MODIFIED:
+        return path.read_bytes()
+
+    meta = {
+        name: response.headers[name]
+        for name in _VALIDATOR_HEADERS
+        if name in response.headers
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(response.content)
+        meta_path.write_text(json.dumps(meta), encoding="utf-8")
+    except OSError:
+        # Caching is only an optimization. Ignore it if it fails.
+        pass
+
+    return response.content
+
+
+def _get_conditional_headers(meta_path: Path) -> dict[str, str]:
+    try:
+        meta = json.loads(meta_path.read_bytes())
+    except (OSError, ValueError):
+        return {}
+
+    return {
+        request_header: meta[response_header]
+        for response_header, request_header in _VALIDATOR_HEADERS.items()
+        if response_header in meta
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def _get_session():
+    # requests is slow to import, so wait until it is actually needed.
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    session.headers["User-Agent"] = f"zmk-setup/{__version__}"
+
+    # Files are downloaded from a few hosts, several at a time.
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    return session
+
+
+def _get_cache_path(url: str):
+    # Only needed once the hardware list is downloaded, so don't slow startup.
+    import hashlib
+    import platformdirs
+
+    cache_dir = Path(platformdirs.user_cache_dir("zmk-setup", appauthor=False))
+    name = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
 
-    path.write_text(response.text, encoding="utf-8")
+    # Don't take the extension from the URL. It may have a query string, which
+    # isn't valid in a file name on Windows.
+    return cache_dir / (name + ".json")
 
 
 _DIGITS = re.compile(r"(\d+)")
@@ -55,6 +196,10 @@ _DIGITS = re.compile(r"(\d+)")
 
 def natural_key(text: str):
     """
-    Key function for sorting which is case insensitive and treats
+    Key function for sorting which is case insensitive and treats runs of
+    digits as numbers.
     """
-    return [int(s) if _DIGITS.fullmatch(s) else s.lower() for s in _DIGITS.split(text)]
+    # Splitting on a capturing group alternates text and digits, starting with
+    # text (which may be empty), so no need to test each part.
+    parts = _DIGITS.split(text.lower())
+    return tuple(int(s) if i & 1 else s for i, s in enumerate(parts))
@@ -20,8 +20,9 @@ class YAML(ruamel.yaml.YAML):
 
     def dump(self, data, stream: Path | IO = None, *, transform=None):
         if isinstance(stream, Path):
+            # A file opened here is always readable and seekable.
             with stream.open("r+", encoding="utf-8") as f:
-                self.dump(data, f, transform=transform)
+                self._dump_seekable(data, f, transform=transform)
                 return
 
         try:
@@ -34,25 +35,54 @@ class YAML(ruamel.yaml.YAML):
 
         super().dump(data, stream=stream, transform=transform)
 
+    def _dump_seekable(self, data, stream: IO, *, transform=None):
+        _seek_to_document_start(stream)
+        stream.truncate()
+        super().dump(data, stream=stream, transform=transform)
+
+
+# Only comments may come before the document start marker, so it is expected
+# near the start of the file.
+_MAX_HEADER_SIZE = 8192
+
 
 def _seek_to_document_start(stream: IO):
-    while True:
-        line = stream.readline()
-        if not line:
-            break
+    text = stream.read(_MAX_HEADER_SIZE)
+    offset = _find_document_start(text, at_eof=len(text) < _MAX_HEADER_SIZE)
+
+    # Text streams can only seek to positions returned by tell(), so re-read up
+    # to the start of the document to get there.
+    stream.seek(0)
+    if offset:
+        stream.read(offset)
+        stream.seek(stream.tell())
 
-        text, _, _ = line.partition("#")
-        text = text.strip()
 
-        if text == "---":
+def _find_document_start(text: str, at_eof: bool):
+    offset = 0
+    while offset < len(text):
+        end = text.find("\n", offset)
+        if end < 0 and not at_eof:
+            # The header is longer than what was read. Treat the whole file as
+            # the document.
+            return 0
+
+        end = len(text) if end < 0 else end + 1
+
+        line, _, _ = text[offset:end].partition("#")
+        line = line.strip()
+
+        if line == "---":
             # Found the start of the document, and everything before it was
             # comments and/or whitespace.
-            stream.seek(stream.tell())
-            return
+            return end
 
-        if text:
+        if line:
             # Found something that wasn't a comment or whitespace before we
             # found a document start marker. The start of the document is the
             # start of the file.
-            stream.seek(0)
-            return
+            return 0
+
+        offset = end
+
+    return offset if at_eof else 0
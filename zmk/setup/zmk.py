@@ -3,17 +3,23 @@
 """
 ZMK file functions
 """
-import json
+from concurrent.futures import Future
 from dataclasses import dataclass, field
-from typing import Literal, Optional, TypeGuard, TypedDict
-import requests
+from pathlib import Path
+import re
+from typing import Literal, Optional, TypeGuard, TypedDict, get_args
 from typing_extensions import NotRequired
 from .config import Config
 from .menu import show_menu, show_prompt
 from .repo import Repo
 from .terminal import Color, colorize
-from .util import StopWizard, natural_key
-from .yaml import YAML
+from .util import StopWizard, fetch_cached, get_file_names, natural_key
+
+try:
+    # orjson is optional, but parses the hardware list much faster.
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
 
 
 _ACTIONS_YAML = ".github/workflows/build.yml"
@@ -23,6 +29,10 @@ _BUILD_YAML = "build.yaml"
 Feature = Literal["keys", "display", "encoder", "underglow", "backlight", "pointer"]
 Output = Literal["usb", "ble"]
 
+# Features and outputs are stored as bit masks for fast membership tests.
+_FEATURE_BITS = {name: 1 << i for i, name in enumerate(get_args(Feature))}
+_OUTPUT_BITS = {name: 1 << i for i, name in enumerate(get_args(Output))}
+
 
 class Board(TypedDict):
     """Metadata for a ZMK board"""
@@ -40,6 +50,11 @@ class Board(TypedDict):
     features: NotRequired[list[Feature]]
     exposes: NotRequired[list[str]]
 
+    # Set by get_hardware_list()
+    _feature_mask: int
+    _output_mask: int
+    _exposes: frozenset[str]
+
 
 class Shield(TypedDict):
     """Metadata for a ZMK shield"""
@@ -55,6 +70,11 @@ class Shield(TypedDict):
     exposes: NotRequired[list[str]]
     requires: NotRequired[list[str]]
 
+    # Set by get_hardware_list()
+    _feature_mask: int
+    _exposes: frozenset[str]
+    _requires: frozenset[str]
+
 
 class Interconnect(TypedDict):
     """Metadata for a ZMK interconnect"""
@@ -83,14 +103,24 @@ def check_repo_files(repo: Repo, config: Config):
         repo.path / _BUILD_YAML,
     ]
 
-    if all(f.exists() for f in files):
+    # List each directory once instead of checking each file separately.
+    dir_contents: dict[Path, set[str]] = {}
+    missing: list[Path] = []
+
+    for path in files:
+        if path.parent not in dir_contents:
+            dir_contents[path.parent] = get_file_names(path.parent)
+
+        if path.name not in dir_contents[path.parent]:
+            missing.append(path)
+
+    if not missing:
         return
 
     print()
     print(colorize("The following required files are missing:", Color.YELLOW))
-    for path in files:
-        if not path.exists():
-            print(colorize(f"- {path.relative_to(repo.path)}", Color.YELLOW))
+    for path in missing:
+        print(colorize(f"- {path.relative_to(repo.path)}", Color.YELLOW))
 
     print()
     if not show_prompt("Initialize these files?"):
@@ -98,9 +128,8 @@ def check_repo_files(repo: Repo, config: Config):
 
     repo.fetch(config.template_url)
 
-    for path in files:
-        if not path.exists():
-            repo.checkout_file("FETCH_HEAD", path)
+    for path in missing:
+        repo.checkout_file("FETCH_HEAD", path)
 
     repo.commit_changes("Initialize repo from template")
 
@@ -121,37 +150,16 @@ def is_keyboard(hardware: Hardware) -> TypeGuard[Keyboard]:
     the "keys" feature)
     """
     if is_board(hardware):
-        return "keys" in hardware.get("features", [])
+        return bool(hardware["_feature_mask"] & _FEATURE_BITS["keys"])
 
     return is_shield(hardware)
 
 
-def is_controller(hardware: Hardware) -> TypeGuard[Board]:
-    """
-    Get whether a hardware entry is a controller (a board that isn't a keyboard)
-    """
-    return is_board(hardware) and not is_keyboard(hardware)
-
-
 def is_interconnect_compatible(shield: Shield, board: Board):
     """
     Get whether the given shield and board have a compatible interconnect.
     """
-    requires = shield.get("requires", [])
-    exposes = board.get("exposes", [])
-    return all(r in exposes for r in requires)
-
-
-def is_compatible_controller(shield: Hardware, board: Hardware):
-    """
-    Get whether the given hardware entries represent a shield and a board which
-    is a compatible controller for that shield.
-    """
-    return (
-        is_shield(shield)
-        and is_controller(board)
-        and is_interconnect_compatible(shield, board)
-    )
+    return shield["_requires"] <= board["_exposes"]
 
 
 def get_sibling_ids(hardware: Hardware) -> list[str]:
@@ -170,7 +178,7 @@ def is_split(hardware: Hardware):
 
 def is_usb_only(hardware: Hardware):
     """Get whether a hardware entry does not support bluetooth"""
-    return "ble" not in hardware.get("outputs", [])
+    return not hardware["_output_mask"] & _OUTPUT_BITS["ble"]
 
 
 @dataclass
@@ -183,25 +191,41 @@ class KeyboardSelection:
     shield_ids: list[str] = field(default_factory=list)
 
 
-def select_keyboard(config: Config):
+def select_keyboard(
+    config: Config, hardware_future: Optional[Future[list[Hardware]]] = None
+):
     """
     Prompt the user to select a keyboard and controller (if needed) from the
     list of hardware supported by ZMK.
+
+    :param hardware_future: Result of get_hardware_list(), if it was started
+    in the background. If not set, the list is downloaded here.
     """
 
     def formatter(hardware):
         return hardware["name"]
 
     print()
-    hardware = _get_hardware_list(config)
+    if hardware_future:
+        hardware = hardware_future.result()
+    else:
+        hardware = get_hardware_list(config)
+
+    keyboards: list[Keyboard] = []
+    controllers: list[Board] = []
+
+    for item in hardware:
+        if is_keyboard(item):
+            keyboards.append(item)
+        elif is_board(item):
+            controllers.append(item)
 
-    keyboards = [x for x in hardware if is_keyboard(x)]
     keyboard = show_menu("Pick a keyboard:", keyboards, formatter)
 
     if is_board(keyboard):
         return KeyboardSelection(keyboard=keyboard, board_ids=get_sibling_ids(keyboard))
 
-    controllers = [x for x in hardware if is_compatible_controller(keyboard, x)]
+    controllers = [x for x in controllers if is_interconnect_compatible(keyboard, x)]
     controller = show_menu("Pick an MCU board:", controllers, formatter)
 
     if is_split(keyboard) and is_usb_only(controller):
@@ -215,16 +239,39 @@ def select_keyboard(config: Config):
     )
 
 
-def _get_hardware_list(config: Config) -> list[Hardware]:
-    response = requests.get(config.metadata_url)
-    response.raise_for_status()
+def get_hardware_list(config: Config) -> list[Hardware]:
+    """
+    Download the list of hardware supported by ZMK, sorted by name.
+    """
+    from requests.exceptions import RequestException
+
+    try:
+        data = fetch_cached(config.metadata_url)
+    except RequestException as ex:
+        raise StopWizard(f"Failed to download the hardware list: {ex}") from ex
 
-    hardware = json.loads(response.text)  # type: list[Hardware]
+    hardware = _json_loads(data)  # type: list[Hardware]
     hardware.sort(key=lambda h: natural_key(h["name"]))
 
+    # Convert lists which are used for membership tests to bit masks and sets
+    # once up front.
+    for item in hardware:
+        item["_feature_mask"] = _get_mask(_FEATURE_BITS, item.get("features", []))
+        item["_output_mask"] = _get_mask(_OUTPUT_BITS, item.get("outputs", []))
+        item["_exposes"] = frozenset(item.get("exposes", []))
+        item["_requires"] = frozenset(item.get("requires", []))
+
     return hardware
 
 
+def _get_mask(bits: dict[str, int], names: list[str]):
+    mask = 0
+    for name in names:
+        # Ignore any values added to the metadata after this script was written.
+        mask |= bits.get(name, 0)
+    return mask
+
+
 def get_config_file_name(keyboard: Keyboard):
     """Get the name of the .conf file for a keyboard"""
     return keyboard["id"] + ".conf"
@@ -239,23 +286,147 @@ def add_to_build_matrix(repo: Repo, selected: KeyboardSelection):
     """Add the selected keyboard to the repo's build.yaml"""
     path = repo.path / "build.yaml"
 
+    builds: list[dict] = []
+    for board in selected.board_ids:
+        if selected.shield_ids:
+            for shield in selected.shield_ids:
+                builds.append({"shield": shield, "board": board})
+        else:
+            builds.append({"board": board})
+
+    # Keep line endings as they are, so the append fast path can see them.
+    with path.open(encoding="utf-8", newline="") as f:
+        text = f.read()
+
+    if not _append_simple_builds(path, text, builds):
+        _merge_builds(path, text, builds)
+
+
+def _merge_builds(path: Path, text: str, builds: list[dict]):
+    """Add any new builds to build.yaml with a full YAML load and dump."""
+    # ruamel.yaml is slow to import, so wait until it is actually needed.
+    from .yaml import YAML
+
     yaml = YAML()
     yaml.indent(mapping=2, sequence=4, offset=2)
 
-    data = yaml.load(path)
+    data = yaml.load(text)
 
     if "include" not in data:
         data["include"] = []
 
-    def add_build(item: dict):
-        if not item in data["include"]:
-            data["include"].append(item)
+    include = data["include"]
 
-    for board in selected.board_ids:
-        if selected.shield_ids:
-            for shield in selected.shield_ids:
-                add_build(dict(shield=shield, board=board))
-        else:
-            add_build(dict(board=board))
+    # Track existing builds in a set so each new build is checked in O(1).
+    existing = set()
+    for build in include:
+        try:
+            existing.add(_get_build_key(build))
+        except (AttributeError, TypeError):
+            # Not a flat mapping, so it can't match a build added here.
+            pass
+
+    for build in builds:
+        key = _get_build_key(build)
+        if key not in existing:
+            existing.add(key)
+            include.append(build)
 
     yaml.dump(data, path)
+
+
+def _get_build_key(build: dict):
+    # Two builds are equal if they have the same keys and values.
+    return frozenset(build.items())
+
+
+# A build.yaml containing nothing but an "include" list of flat mappings, in the
+# same format that add_to_build_matrix() writes.
+_SIMPLE_BUILD_YAML = re.compile(r"include:\n((?:  - .*\n(?:    .*\n)*)*)", re.ASCII)
+_SIMPLE_BUILD_ITEM = re.compile(r"(?:  - |    )(\w+): (\S+)\n", re.ASCII)
+_PLAIN_STRING = re.compile(r"[A-Za-z_][\w-]*", re.ASCII)
+
+
+def _is_plain_string(value) -> bool:
+    """
+    Get whether a value is a string which YAML writes without quotes and reads
+    back as the same string.
+    """
+    return (
+        isinstance(value, str)
+        and _PLAIN_STRING.fullmatch(value) is not None
+        and value.lower() not in ("null", "true", "false")
+    )
+
+
+def _format_builds(builds: list) -> Optional[str]:
+    """
+    Format a list of builds as YAML list items.
+
+    :return: The formatted text, or None if any build is not a flat mapping of
+    plain strings.
+    """
+    lines = []
+    for build in builds:
+        if not isinstance(build, dict) or not build:
+            return None
+
+        for i, (key, value) in enumerate(build.items()):
+            if not _is_plain_string(key) or not _is_plain_string(value):
+                return None
+
+            lines.append(f"{'    ' if i else '  - '}{key}: {value}\n")
+
+    return "".join(lines)
+
+
+def _append_simple_builds(path: Path, text: str, builds: list[dict]):
+    """
+    If build.yaml has the simple format that add_to_build_matrix() would write,
+    append any new builds to the end of the file without a full YAML load/dump.
+
+    :return: Whether the builds were added. If False, the file was not changed.
+    """
+    # Appending "\n" lines to a file with "\r\n" line endings would mix them,
+    # so leave those files for ruamel to rewrite.
+    match = None if "\r" in text else _SIMPLE_BUILD_YAML.fullmatch(text)
+    if not match:
+        return False
+
+    items: list[dict[str, str]] = []
+    for line in match.group(1).splitlines(keepends=True):
+        pair = _SIMPLE_BUILD_ITEM.fullmatch(line)
+        if not pair:
+            return False
+
+        if line.startswith("  - "):
+            items.append({})
+
+        key, value = pair.groups()
+        if key in items[-1] or not _is_plain_string(key):
+            return False
+
+        if not _is_plain_string(value):
+            # Leave anything that doesn't parse as a plain string to ruamel.
+            return False
+
+        items[-1][key] = value
+
+    existing = {_get_build_key(item) for item in items}
+    new_builds = []
+
+    for build in builds:
+        key = _get_build_key(build)
+        if key not in existing:
+            existing.add(key)
+            new_builds.append(build)
+
+    new_text = _format_builds(new_builds)
+    if new_text is None:
+        return False
+
+    if new_text:
+        with path.open("a", encoding="utf-8", newline="") as f:
+            f.write(new_text)
+
+    return True